@@ -1,7 +1,8 @@
-from pyftdi.spi import SpiController
-from pyftdi.gpio import GpioController
+import struct
 import time
 
+from device_cache import open_cached
+
 class FT232HQ:
     # Definición de pines
     ADBUS = {
@@ -28,6 +29,10 @@ class FT232HQ:
         'ACBUS9': 17
     }
 
+    # Pines de la palabra de puerto: GpioController de pyftdi
+    # (GpioAsyncController) solo controla los 8 pines ADBUS
+    PORT_MASK = 0xFF
+
     def __init__(self, url='ftdi://ftdi:ft232h/1'):
         """
         Inicializa la conexión con el FT232HQ
@@ -41,17 +46,22 @@ class FT232HQ:
         self.connected = False
         self.adbus_direction = 0  # 0 = entrada, 1 = salida
         self.acbus_direction = 0  # 0 = entrada, 1 = salida
+        self.port_output = 0  # Último valor escrito en cada pin ADBUS (bit N = ADBUSN)
 
     def connect(self):
         """
         Establece la conexión con el dispositivo
         """
         try:
-            # Inicializar controlador SPI
+            # Los controladores se importan al conectar para acelerar el arranque
+            from pyftdi.spi import SpiController
+            from pyftdi.gpio import GpioController
+
+            # Inicializar controlador SPI (abre por bus/dirección en caché)
             self.spi = SpiController()
-            self.spi.configure(self.url)
+            open_cached(self.url, self.spi.configure)
             
-            # Inicializar controlador GPIO
+            # Inicializar controlador GPIO (solo admite URL)
             self.gpio = GpioController()
             self.gpio.open_from_url(self.url)
             
@@ -81,6 +91,7 @@ class FT232HQ:
         
         self.adbus_direction = 0
         self.acbus_direction = 0
+        self.port_output = 0
 
     def configure_adbus(self, pins, direction='input'):
         """
@@ -133,6 +144,7 @@ class FT232HQ:
         
         if pin_name in self.ADBUS:
             self.gpio.write(self.ADBUS[pin_name], value)
+            self._set_output_bit(self.ADBUS[pin_name], value)
 
     def write_acbus(self, pin_name, value):
         """
@@ -204,6 +216,49 @@ class FT232HQ:
         
         return {pin_name: self.read_acbus(pin_name) for pin_name in self.ACBUS}
 
+    def _set_output_bit(self, pin, value):
+        if not (1 << pin) & self.PORT_MASK:
+            return
+        if value:
+            self.port_output |= 1 << pin
+        else:
+            self.port_output &= ~(1 << pin)
+
+    def write_port_word(self, value, mask=PORT_MASK):
+        """
+        Escribe varios pines ADBUS con una única escritura del puerto
+
+        Los pines fuera de la máscara conservan el último valor escrito.
+
+        Args:
+            value (int): Bit N = valor de ADBUSN (bits 0-7)
+            mask (int): Bit N = 1 si ADBUSN debe escribirse
+        """
+        if not self.connected:
+            raise Exception("Dispositivo no conectado")
+        if mask & ~self.PORT_MASK:
+            raise ValueError("La palabra de puerto solo incluye los pines ADBUS (bits 0-7)")
+
+        output = (self.port_output & ~mask) | (value & mask)
+        self.gpio.write(output)
+        # Solo se actualiza si la escritura tuvo éxito
+        self.port_output = output
+
+    def read_port_word(self):
+        """
+        Lee el estado de los pines ADBUS con una única lectura del puerto
+
+        Returns:
+            int: Bit N = estado de ADBUSN (bits 0-7)
+        """
+        if not self.connected:
+            raise Exception("Dispositivo no conectado")
+
+        value = self.gpio.read()
+        if not isinstance(value, int):
+            value = value[0]
+        return value & self.PORT_MASK
+
     def disconnect(self):
         """
         Cierra la conexión con el dispositivo
@@ -248,6 +303,110 @@ class FT232HQ:
         port = self.spi.get_port(cs=cs, freq=freq, mode=0)
         return port.read(length)
 
+    def exchange_spi(self, data, readlen, cs=0, freq=30E6):
+        """
+        Escribe y luego lee datos en una única transacción SPI (CS activo
+        durante toda la operación)
+        
+        Args:
+            data (bytes): Datos a escribir (ej: comando y dirección)
+            readlen (int): Cantidad de bytes a leer después de escribir
+            cs (int): Número del pin CS a usar
+            freq (float): Frecuencia del bus SPI en Hz
+            
+        Returns:
+            bytes: Datos leídos
+        """
+        if not self.connected:
+            raise Exception("Dispositivo no conectado")
+        
+        port = self.spi.get_port(cs=cs, freq=freq, mode=0)
+        return port.exchange(data, readlen)
+
+    def _spi_batch_commands(self, port, transactions):
+        """
+        Construye el flujo de comandos MPSSE de un lote de transacciones SPI
+
+        Cada transacción se enmarca igual que en
+        SpiController._exchange_half_duplex de pyftdi: los bytes de estado de
+        CS del puerto se envían como SET_BITS_LOW (enmascarados con el estado
+        de los GPIO) y al final se restaura el reposo con CS en alto.
+
+        Args:
+            port (SpiPort): Puerto SPI de pyftdi (modo 0)
+            transactions (list): Tuplas (data, readlen)
+
+        Returns:
+            tuple: (comandos MPSSE, lista de readlen por transacción)
+        """
+        from pyftdi.ftdi import Ftdi
+
+        spi = self.spi
+        direction = spi.direction & 0xFF
+        prolog = bytearray()
+        for ctrl in port._cs_prolog:
+            prolog.extend((Ftdi.SET_BITS_LOW, (ctrl & spi._spi_mask) | spi._gpio_low, direction))
+        epilog = bytearray()
+        for ctrl in port._cs_epilog:
+            epilog.extend((Ftdi.SET_BITS_LOW, (ctrl & spi._spi_mask) | spi._gpio_low, direction))
+        epilog.extend((Ftdi.SET_BITS_LOW, spi._cs_bits | spi._gpio_low, direction))
+
+        cmd = bytearray()
+        readlens = []
+        for data, readlen in transactions:
+            if len(data) > spi.PAYLOAD_MAX_LENGTH or readlen > spi.PAYLOAD_MAX_LENGTH:
+                raise Exception("Transacción SPI demasiado grande")
+            cmd.extend(prolog)
+            if data:
+                cmd.extend(struct.pack('<BH', Ftdi.WRITE_BYTES_NVE_MSB, len(data) - 1))
+                cmd.extend(data)
+            if readlen:
+                cmd.extend(struct.pack('<BH', Ftdi.READ_BYTES_NVE_MSB, readlen - 1))
+            cmd.extend(epilog)
+            readlens.append(readlen)
+        if sum(readlens):
+            cmd.append(Ftdi.SEND_IMMEDIATE)
+        return bytes(cmd), readlens
+
+    def exchange_spi_batch(self, transactions, cs=0, freq=30E6):
+        """
+        Ejecuta varias transacciones SPI (cada una con su ciclo de CS) en un
+        único lote de comandos MPSSE y un único viaje de ida y vuelta USB
+
+        Args:
+            transactions (list): Tuplas (data, readlen): bytes a escribir y
+                cantidad de bytes a leer después en la misma transacción
+            cs (int): Número del pin CS a usar
+            freq (float): Frecuencia del bus SPI en Hz
+
+        Returns:
+            list: Datos leídos de cada transacción (b'' si readlen es 0)
+        """
+        if not self.connected:
+            raise Exception("Dispositivo no conectado")
+
+        port = self.spi.get_port(cs=cs, freq=freq, mode=0)
+        cmd, readlens = self._spi_batch_commands(port, transactions)
+        total = sum(readlens)
+
+        # Mismo bloqueo y gestión de frecuencia que SpiController.exchange()
+        with self.spi._lock:
+            ftdi = self.spi.ftdi
+            if self.spi._frequency != port.frequency:
+                ftdi.set_frequency(port.frequency)
+                self.spi._frequency = port.frequency
+            ftdi.write_data(cmd)
+            data = ftdi.read_data_bytes(total, 4) if total else b''
+        if len(data) != total:
+            raise Exception("Respuesta SPI incompleta")
+
+        results = []
+        offset = 0
+        for readlen in readlens:
+            results.append(bytes(data[offset:offset + readlen]))
+            offset += readlen
+        return results
+
     def set_gpio(self, pins, values):
         """
         Establece el estado de los pines GPIO
@@ -262,6 +421,7 @@ class FT232HQ:
         for pin, value in zip(pins, values):
             self.gpio.set_direction(pin, 1)  # 1 = salida
             self.gpio.write(pin, value)
+            self._set_output_bit(pin, value)
 
     def read_gpio(self, pins):
         """
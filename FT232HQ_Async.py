@@ -0,0 +1,447 @@
+from concurrent.futures import Future
+import asyncio
+import queue
+import threading
+
+from FT232HQ import FT232HQ
+from FT232HQ_I2C import FT232HQ_I2C
+from TMP100 import TMP100
+
+
+class DeviceWorker:
+    """
+    Hilo de E/S dedicado a un dispositivo físico.
+
+    Todas las operaciones enviadas al mismo dispositivo se ejecutan en un
+    único hilo y en el orden en que fueron enviadas, por lo que nunca se
+    intercalan transacciones USB de distintas corrutinas.
+    """
+
+    # Hilos activos por URL, compartidos entre clientes GPIO/SPI/I2C
+    _workers = {}
+    _workers_lock = threading.Lock()
+
+    def __init__(self, url):
+        """
+        Inicializa el hilo de E/S
+
+        Args:
+            url (str): URL del dispositivo FTDI atendido por este hilo
+        """
+        self.url = url
+        self.users = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"FT232HQ-IO {url}", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def acquire(cls, url):
+        """
+        Obtiene el hilo de E/S de un dispositivo, creándolo si no existe
+
+        Args:
+            url (str): URL del dispositivo FTDI
+
+        Returns:
+            DeviceWorker: Hilo de E/S compartido del dispositivo
+        """
+        with cls._workers_lock:
+            worker = cls._workers.get(url)
+            if worker is None:
+                worker = cls(url)
+                cls._workers[url] = worker
+            worker.users += 1
+            return worker
+
+    def release(self, wait=True):
+        """
+        Libera una referencia al hilo y lo detiene cuando nadie lo usa
+
+        Args:
+            wait (bool): Esperar a que el hilo termine (False si puede estar
+                bloqueado en una operación que no va a terminar)
+        """
+        with self._workers_lock:
+            self.users -= 1
+            if self.users > 0:
+                return
+            if self._workers.get(self.url) is self:
+                del self._workers[self.url]
+        self.stop(wait)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Encola una operación para ejecutarla en el hilo de E/S
+
+        Args:
+            func (callable): Operación bloqueante a ejecutar
+
+        Returns:
+            concurrent.futures.Future: Resultado de la operación
+        """
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def stop(self, wait=True):
+        """
+        Detiene el hilo después de completar las operaciones pendientes
+
+        Args:
+            wait (bool): Esperar a que el hilo termine
+        """
+        self._queue.put(None)
+        if wait and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            future, func, args, kwargs = job
+            # Las operaciones canceladas antes de empezar no llegan al bus
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class _AsyncClient:
+    """
+    Base común de los clientes asíncronos: envía operaciones al hilo de E/S
+    del dispositivo y las espera con timeout opcional.
+    """
+
+    def __init__(self, device, timeout=None):
+        self.device = device
+        self.timeout = timeout
+        self.worker = None
+
+    async def _call(self, func, *args, timeout=None, **kwargs):
+        if self.worker is None:
+            raise Exception("Dispositivo no conectado")
+        future = asyncio.wrap_future(self.worker.submit(func, *args, **kwargs))
+        if timeout is None:
+            timeout = self.timeout
+        # Cancelar la espera cancela la operación si aún no ha empezado
+        return await asyncio.wait_for(future, timeout)
+
+    async def _batch(self, operations, timeout=None):
+        """
+        Ejecuta una lista de operaciones (func, args) como un único trabajo,
+        sin que otra operación pueda intercalarse en el bus
+        """
+        def run():
+            return [func(*args) for func, args in operations]
+        return await self._call(run, timeout=timeout)
+
+    async def connect(self):
+        """
+        Establece la conexión con el dispositivo desde su hilo de E/S
+        """
+        if self.worker is None:
+            self.worker = DeviceWorker.acquire(self.device.url)
+        await self._call(self.device.connect)
+        return self.device.connected
+
+    async def disconnect(self):
+        """
+        Cierra la conexión y libera el hilo de E/S
+        """
+        if self.worker is None:
+            return
+        try:
+            await self._call(self.device.disconnect)
+        finally:
+            worker, self.worker = self.worker, None
+            await asyncio.get_running_loop().run_in_executor(None, worker.release)
+
+    @property
+    def connected(self):
+        return self.worker is not None and self.device.connected
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+
+
+class AsyncFT232HQ(_AsyncClient):
+    """
+    Cliente asyncio para GPIO y SPI del FT232HQ
+    """
+
+    def __init__(self, url='ftdi://ftdi:ft232h/1', timeout=None):
+        """
+        Inicializa el cliente asíncrono
+
+        Args:
+            url (str): URL del dispositivo FTDI (por defecto: ftdi://ftdi:ft232h/1)
+            timeout (float): Tiempo máximo por operación en segundos (None = sin límite)
+        """
+        super().__init__(FT232HQ(url), timeout)
+
+    async def configure_adbus(self, pins, direction='input'):
+        return await self._call(self.device.configure_adbus, pins, direction)
+
+    async def configure_acbus(self, pins, direction='input'):
+        return await self._call(self.device.configure_acbus, pins, direction)
+
+    async def write_adbus(self, pin_name, value):
+        return await self._call(self.device.write_adbus, pin_name, value)
+
+    async def write_acbus(self, pin_name, value):
+        return await self._call(self.device.write_acbus, pin_name, value)
+
+    async def read_adbus(self, pin_name):
+        return await self._call(self.device.read_adbus, pin_name)
+
+    async def read_acbus(self, pin_name):
+        return await self._call(self.device.read_acbus, pin_name)
+
+    async def read_all_adbus(self):
+        return await self._call(self.device.read_all_adbus)
+
+    async def read_all_acbus(self):
+        return await self._call(self.device.read_all_acbus)
+
+    async def write_spi(self, data, cs=0, freq=30E6):
+        return await self._call(self.device.write_spi, data, cs, freq)
+
+    async def read_spi(self, length, cs=0, freq=30E6):
+        return await self._call(self.device.read_spi, length, cs, freq)
+
+    async def set_gpio(self, pins, values):
+        return await self._call(self.device.set_gpio, pins, values)
+
+    async def read_gpio(self, pins):
+        return await self._call(self.device.read_gpio, pins)
+
+    @staticmethod
+    def _pin_number(pin_name):
+        # La palabra de puerto solo incluye ADBUS (FT232HQ.PORT_MASK)
+        if pin_name not in FT232HQ.ADBUS:
+            raise ValueError(f"{pin_name} no es un pin ADBUS; usar write_acbus/read_acbus")
+        return FT232HQ.ADBUS[pin_name]
+
+    async def write_pins(self, values, timeout=None):
+        """
+        Escribe varios pines ADBUS con una única escritura del puerto
+
+        Args:
+            values (dict): Valores por nombre de pin (ej: {'ADBUS0': 1, 'ADBUS3': 0})
+            timeout (float): Tiempo máximo en segundos
+
+        Raises:
+            ValueError: Si algún nombre no es un pin ADBUS
+        """
+        word = 0
+        mask = 0
+        for pin_name, value in values.items():
+            pin = self._pin_number(pin_name)
+            mask |= 1 << pin
+            if value:
+                word |= 1 << pin
+        await self._call(self.device.write_port_word, word, mask, timeout=timeout)
+
+    async def read_pins(self, pins, timeout=None):
+        """
+        Lee varios pines ADBUS con una única lectura del puerto
+
+        Args:
+            pins (list): Nombres de pines a leer
+            timeout (float): Tiempo máximo en segundos
+
+        Returns:
+            dict: Valor leído por nombre de pin
+
+        Raises:
+            ValueError: Si algún nombre no es un pin ADBUS
+        """
+        numbers = {pin_name: self._pin_number(pin_name) for pin_name in pins}
+        word = await self._call(self.device.read_port_word, timeout=timeout)
+        return {pin_name: (word >> pin) & 1 for pin_name, pin in numbers.items()}
+
+    async def spi_transfers(self, transfers, cs=0, freq=30E6, timeout=None):
+        """
+        Ejecuta una secuencia de escrituras/lecturas SPI en un único lote de
+        comandos MPSSE (FT232HQ.exchange_spi_batch), sin intercalado
+
+        Cada elemento es una transacción con su propio ciclo de CS.
+
+        Args:
+            transfers (list): Elementos bytes (escritura) o int (bytes a leer)
+            cs (int): Número del pin CS a usar
+            freq (float): Frecuencia del bus SPI en Hz
+            timeout (float): Tiempo máximo en segundos
+
+        Returns:
+            list: Datos leídos por cada lectura (None para las escrituras)
+        """
+        transactions = [(b'', transfer) if isinstance(transfer, int) else (bytes(transfer), 0)
+                        for transfer in transfers]
+        results = await self._call(self.device.exchange_spi_batch, transactions, cs, freq,
+                                   timeout=timeout)
+        return [result if isinstance(transfer, int) else None
+                for transfer, result in zip(transfers, results)]
+
+
+class AsyncFT232HQ_I2C(_AsyncClient):
+    """
+    Cliente asyncio para el bus I2C del FT232HQ
+    """
+
+    def __init__(self, url='ftdi://ftdi:ft232h/1', freq=None, timeout=None):
+        """
+        Inicializa el cliente I2C asíncrono
+
+        Args:
+            url (str): URL del dispositivo FTDI
+            freq (int): Frecuencia del bus I2C en Hz (None = perfil guardado
+                del adaptador o 100kHz si no hay perfil)
+            timeout (float): Tiempo máximo por operación en segundos (None = sin límite)
+        """
+        super().__init__(FT232HQ_I2C(url, freq), timeout)
+
+    async def write_data(self, address, data):
+        return await self._call(self.device.write_data, address, data)
+
+    async def read_data(self, address, length):
+        return await self._call(self.device.read_data, address, length)
+
+    async def scan_bus(self):
+        return await self._call(self.device.scan_bus)
+
+    async def write_register(self, address, register, data):
+        return await self._call(self.device.write_register, address, register, data)
+
+    async def read_register(self, address, register, length=1):
+        return await self._call(self.device.read_register, address, register, length)
+
+    async def read_registers(self, requests, timeout=None):
+        """
+        Lee varios registros en un único trabajo del hilo de E/S
+
+        Args:
+            requests (list): Tuplas (address, register, length)
+            timeout (float): Tiempo máximo en segundos
+
+        Returns:
+            list: Datos leídos de cada registro, en el mismo orden
+        """
+        operations = [(self.device.read_register, tuple(request)) for request in requests]
+        return await self._batch(operations, timeout)
+
+    async def write_registers(self, requests, timeout=None):
+        """
+        Escribe varios registros en un único trabajo del hilo de E/S
+
+        Args:
+            requests (list): Tuplas (address, register, data)
+            timeout (float): Tiempo máximo en segundos
+
+        Returns:
+            list: True/False por cada escritura
+        """
+        operations = [(self.device.write_register, tuple(request)) for request in requests]
+        return await self._batch(operations, timeout)
+
+
+class AsyncTMP100:
+    """
+    Acceso asyncio a un sensor TMP100 conectado a un AsyncFT232HQ_I2C
+    """
+
+    def __init__(self, i2c, sensor):
+        """
+        Usar AsyncTMP100.create() para construir instancias
+
+        Args:
+            i2c (AsyncFT232HQ_I2C): Cliente I2C asíncrono conectado
+            sensor (TMP100): Sensor ya configurado
+        """
+        self.i2c = i2c
+        self.sensor = sensor
+
+    @classmethod
+    async def create(cls, i2c, address='00', resolution=12, timeout=None):
+        """
+        Crea y configura el sensor desde el hilo de E/S del bus
+
+        Args:
+            i2c (AsyncFT232HQ_I2C): Cliente I2C asíncrono conectado
+            address (str): Dirección I2C del sensor ('00', '01', '10', '11')
+            resolution (int): Resolución en bits (9-12)
+            timeout (float): Tiempo máximo en segundos
+
+        Returns:
+            AsyncTMP100: Sensor listo para usar
+        """
+        sensor = await i2c._call(TMP100, i2c.device, address, resolution, timeout=timeout)
+        return cls(i2c, sensor)
+
+    async def read_temperature(self, timeout=None):
+        return await self.i2c._call(self.sensor.read_temperature, timeout=timeout)
+
+    async def set_high_limit(self, temperature):
+        return await self.i2c._call(self.sensor.set_high_limit, temperature)
+
+    async def set_low_limit(self, temperature):
+        return await self.i2c._call(self.sensor.set_low_limit, temperature)
+
+    async def set_resolution(self, resolution):
+        return await self.i2c._call(self.sensor.set_resolution, resolution)
+
+    async def get_configuration(self):
+        return await self.i2c._call(self.sensor.get_configuration)
+
+    @staticmethod
+    async def read_temperatures(sensors, timeout=None):
+        """
+        Lee la temperatura de varios sensores
+
+        Los sensores que comparten bus se leen en un único trabajo de su hilo
+        de E/S; los buses distintos se leen en paralelo.
+
+        Args:
+            sensors (list): Instancias de AsyncTMP100
+            timeout (float): Tiempo máximo en segundos
+
+        Returns:
+            list: Temperaturas en grados Celsius, en el mismo orden
+        """
+        groups = {}
+        for index, sensor in enumerate(sensors):
+            groups.setdefault(id(sensor.i2c), (sensor.i2c, []))[1].append(index)
+
+        async def read_group(i2c, indexes):
+            operations = [(sensors[i].sensor.read_temperature, ()) for i in indexes]
+            return indexes, await i2c._batch(operations, timeout)
+
+        results = [None] * len(sensors)
+        for indexes, values in await asyncio.gather(*(read_group(*g) for g in groups.values())):
+            for i, value in zip(indexes, values):
+                results[i] = value
+        return results
+
+
+if __name__ == "__main__":
+    # Ejemplo de uso
+    async def main():
+        async with AsyncFT232HQ_I2C(freq=100000, timeout=1.0) as i2c:
+            sensors = [await AsyncTMP100.create(i2c, address) for address in ('00', '01')]
+
+            # Lectura concurrente: un solo hilo de E/S atiende todas las corrutinas
+            temps = await asyncio.gather(*(s.read_temperature() for s in sensors))
+            print(f"Temperaturas: {[f'{t:.2f}°C' for t in temps]}")
+
+            # Lectura por lotes: un único trabajo en el bus
+            temps = await AsyncTMP100.read_temperatures(sensors)
+            print(f"Temperaturas (lote): {[f'{t:.2f}°C' for t in temps]}")
+
+    asyncio.run(main())
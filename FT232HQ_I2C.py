@@ -1,17 +1,103 @@
-from pyftdi.i2c import I2cController
+from contextlib import contextmanager
+import json
+import math
+import os
+import tempfile
+import threading
 import time
 
+try:
+    import fcntl
+except ImportError:  # Windows: solo se sincronizan los hilos del proceso
+    fcntl = None
+
+from device_cache import DeviceCache, get_cache, open_cached
+
+PROFILES_PATH = os.environ.get(
+    'FT232HQ_I2C_PROFILES',
+    os.path.join(os.path.expanduser('~'), '.config', 'ft232hq', 'i2c_profiles.json'))
+
+
+def load_i2c_profiles(path=PROFILES_PATH):
+    """
+    Lee los perfiles de frecuencia I2C guardados
+
+    Returns:
+        dict: Perfil por número de serie del adaptador
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Serializa la lectura-modificación-escritura de perfiles entre hilos
+_profiles_lock = threading.Lock()
+
+
+@contextmanager
+def _profiles_locked(path):
+    """
+    Bloqueo exclusivo del archivo de perfiles entre hilos y procesos
+    """
+    with _profiles_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def save_i2c_profile(serial, profile, path=PROFILES_PATH):
+    """
+    Guarda el perfil de frecuencia I2C de un adaptador, conservando los
+    perfiles guardados a la vez por otros hilos o procesos
+
+    Args:
+        serial (str): Número de serie del adaptador
+        profile (dict): Perfil (freq, addresses, tuned)
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with _profiles_locked(path):
+        profiles = load_i2c_profiles(path)
+        profiles[serial] = profile
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(profiles, f, indent=2)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
 class FT232HQ_I2C:
-    def __init__(self, url='ftdi://ftdi:ft232h/1', freq=100000):
+    # Frecuencias estándar (standard, fast y fast-mode plus) para el autoajuste
+    FREQUENCIES = [100000, 400000, 1000000]
+    DEFAULT_FREQ = 100000
+
+    def __init__(self, url='ftdi://ftdi:ft232h/1', freq=None, fallback_errors=3):
         """
         Inicializa el controlador I2C
         
         Args:
             url (str): URL del dispositivo FTDI
-            freq (int): Frecuencia del bus I2C en Hz (por defecto 100kHz)
+            freq (int): Frecuencia del bus I2C en Hz (None = perfil guardado
+                del adaptador o 100kHz si no hay perfil)
+            fallback_errors (int): Errores consecutivos tras los que se baja a
+                la frecuencia estándar inferior (0 = desactivado)
         """
         self.url = url
         self.freq = freq
+        self.use_profile = freq is None
+        self.fallback_errors = fallback_errors
+        self.errors = 0
         self.i2c = None
         self.connected = False
         
@@ -26,14 +112,172 @@ class FT232HQ_I2C:
         Establece la conexión I2C
         """
         try:
+            # El controlador se importa al conectar para acelerar el arranque
+            from pyftdi.i2c import I2cController
+
+            if self.use_profile:
+                profile = self.load_profile()
+                self.freq = profile.get('freq', self.DEFAULT_FREQ) if profile else self.DEFAULT_FREQ
+
             self.i2c = I2cController()
-            self.i2c.configure(self.url, freq=self.freq)
+            open_cached(self.url, lambda device: self.i2c.configure(device, frequency=self.freq))
+            self.errors = 0
             self.connected = True
             print("Conexión I2C establecida exitosamente")
         except Exception as e:
             print(f"Error al conectar I2C: {str(e)}")
             self.connected = False
 
+    def adapter_serial(self):
+        """
+        Obtiene el número de serie del adaptador (de la URL o de la caché)
+
+        Returns:
+            str: Número de serie, o None si no se puede determinar
+        """
+        try:
+            serial = DeviceCache.parse_url(self.url)[2]
+        except ValueError:
+            return None
+        if serial:
+            return serial
+        try:
+            entry = get_cache().lookup(self.url)
+        except Exception:
+            return None
+        return entry['serial'] if entry and entry['serial'] else None
+
+    def load_profile(self):
+        """
+        Lee el perfil de frecuencia guardado para este adaptador
+
+        Returns:
+            dict: Perfil del adaptador, o None si no existe
+        """
+        serial = self.adapter_serial()
+        return load_i2c_profiles().get(serial) if serial else None
+
+    def set_frequency(self, freq):
+        """
+        Reconfigura el bus I2C a otra frecuencia
+
+        Args:
+            freq (int): Nueva frecuencia en Hz
+        """
+        if not self.connected:
+            raise Exception("Dispositivo no conectado")
+        self.i2c.terminate()
+        open_cached(self.url, lambda device: self.i2c.configure(device, frequency=freq))
+        self.freq = freq
+        self.errors = 0
+
+    def _bus_ok(self):
+        self.errors = 0
+
+    def _bus_error(self):
+        """
+        Registra un error de bus y baja de frecuencia tras varios seguidos
+        """
+        self.errors += 1
+        if not self.fallback_errors or self.errors < self.fallback_errors:
+            return
+        lower = [f for f in self.FREQUENCIES if f < self.freq]
+        if not lower:
+            self.errors = 0
+            return
+        print(f"Demasiados errores I2C a {self.freq} Hz, bajando a {lower[-1]} Hz")
+        try:
+            self.set_frequency(lower[-1])
+        except Exception as e:
+            print(f"Error al cambiar la frecuencia I2C: {str(e)}")
+
+    def _probe_register(self, address, register, length):
+        """
+        Lee un registro sin imprimir errores (None si falla)
+        """
+        try:
+            return bytes(self.i2c.get_port(address).exchange([register], length))
+        except Exception:
+            return None
+
+    def _check_bus(self, freq, expected, trials):
+        """
+        Comprueba que todas las lecturas a una frecuencia coinciden con las de referencia
+        """
+        try:
+            self.set_frequency(freq)
+        except Exception:
+            return False
+        for _ in range(trials):
+            for (address, register, length), data in expected.items():
+                if self._probe_register(address, register, length) != data:
+                    return False
+        return True
+
+    def autotune(self, registers, length=1, trials=20, margin=0.1, frequencies=None, save=True):
+        """
+        Busca la mayor frecuencia estándar a la que el bus funciona sin errores
+
+        A cada frecuencia se leen repetidamente registros de los dispositivos
+        y se comparan con la lectura de referencia a la frecuencia más baja.
+        El margen se exige como lecturas adicionales sin errores a la propia
+        frecuencia: probar por encima de ella cambiaría la tabla de tiempos
+        de pyftdi (p. ej. 440 kHz ya usa la de 1 MHz) y sacaría de su rango
+        a los dispositivos Fast-mode.
+
+        Args:
+            registers (dict): Registro a leer por dirección de dispositivo; debe
+                ser un registro cuyo valor no cambie durante la prueba (ej:
+                {0x48: 0x01}, CONFIGURATION del TMP100, no su registro de
+                temperatura)
+            length (int): Bytes a leer de cada registro
+            trials (int): Lecturas de cada registro por frecuencia
+            margin (float): Lecturas adicionales exigidas, como fracción de
+                trials (0.1 = 10% más lecturas)
+            frequencies (list): Frecuencias candidatas (por defecto FREQUENCIES)
+            save (bool): Guardar el resultado en el perfil del adaptador
+
+        Returns:
+            int: Frecuencia seleccionada en Hz
+        """
+        if not self.connected:
+            raise Exception("Dispositivo no conectado")
+
+        if not registers:
+            raise ValueError("Se debe indicar al menos un registro estable por dispositivo")
+
+        frequencies = sorted(frequencies or self.FREQUENCIES)
+        addresses = list(registers)
+        self.set_frequency(frequencies[0])
+
+        # Lecturas de referencia a la frecuencia más baja
+        expected = {}
+        for address, register in registers.items():
+            key = (address, register, length)
+            first = self._probe_register(*key)
+            if first is None or first != self._probe_register(*key):
+                raise Exception(f"Lectura inestable en el dispositivo {hex(address)}")
+            expected[key] = first
+
+        checks = trials + math.ceil(trials * margin)
+        best = frequencies[0]
+        for freq in frequencies[1:]:
+            if not self._check_bus(freq, expected, checks):
+                break
+            best = freq
+
+        self.set_frequency(best)
+        print(f"Frecuencia I2C seleccionada: {best} Hz")
+
+        serial = self.adapter_serial()
+        if save and serial:
+            save_i2c_profile(serial, {
+                'freq': best,
+                'addresses': addresses,
+                'tuned': time.strftime('%Y-%m-%dT%H:%M:%S')
+            })
+        return best
+
     def disconnect(self):
         """
         Cierra la conexión I2C
@@ -104,9 +348,11 @@ class FT232HQ_I2C:
         try:
             port = self.i2c.get_port(address)
             port.write(data)
+            self._bus_ok()
             return True
         except Exception as e:
             print(f"Error en escritura I2C: {str(e)}")
+            self._bus_error()
             return False
 
     def read_data(self, address, length):
@@ -125,9 +371,12 @@ class FT232HQ_I2C:
         
         try:
             port = self.i2c.get_port(address)
-            return port.read(length)
+            data = port.read(length)
+            self._bus_ok()
+            return data
         except Exception as e:
             print(f"Error en lectura I2C: {str(e)}")
+            self._bus_error()
             return []
 
     def scan_bus(self):
@@ -168,9 +417,11 @@ class FT232HQ_I2C:
         try:
             port = self.i2c.get_port(address)
             port.write([register] + data)
+            self._bus_ok()
             return True
         except Exception as e:
             print(f"Error en escritura de registro: {str(e)}")
+            self._bus_error()
             return False
 
     def read_register(self, address, register, length=1):
@@ -190,10 +441,13 @@ class FT232HQ_I2C:
         
         try:
             port = self.i2c.get_port(address)
-            port.write([register])
-            return port.read(length)
+            # Escritura del puntero y lectura con START repetido en una sola transacción
+            data = port.exchange([register], length)
+            self._bus_ok()
+            return data
         except Exception as e:
             print(f"Error en lectura de registro: {str(e)}")
+            self._bus_error()
             return []
 
 if __name__ == "__main__":
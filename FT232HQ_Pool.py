@@ -0,0 +1,208 @@
+from concurrent.futures import wait
+import time
+
+from device_cache import get_cache
+from FT232HQ import FT232HQ
+from FT232HQ_Async import DeviceWorker
+
+
+class PoolResult:
+    """
+    Resultado de una operación sobre un adaptador del pool
+    """
+
+    def __init__(self, serial, value=None, error=None, elapsed=0.0):
+        """
+        Args:
+            serial (str): Número de serie del adaptador
+            value: Valor devuelto por la operación
+            error (Exception): Excepción producida (None si terminó bien)
+            elapsed (float): Duración de la operación en segundos
+        """
+        self.serial = serial
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return f"PoolResult({self.serial!r}, value={self.value!r}, elapsed={self.elapsed:.3f})"
+        return f"PoolResult({self.serial!r}, error={self.error!r}, elapsed={self.elapsed:.3f})"
+
+
+class FT232HQPool:
+    """
+    Pool de adaptadores FT232H identificados por número de serie.
+
+    Cada adaptador tiene su propio hilo de E/S (DeviceWorker), de modo que
+    una misma operación se ejecuta en todos los adaptadores a la vez y el
+    tiempo total se aproxima al del dispositivo más lento.
+    """
+
+    VENDOR_ID = 0x0403
+    PRODUCT_ID = 0x6014  # FT232H
+
+    def __init__(self, serials=None, factory=FT232HQ, interface=1):
+        """
+        Inicializa el pool
+
+        Args:
+            serials (list): Números de serie a usar (None = todos los encontrados)
+            factory (callable): Crea el objeto de dispositivo a partir de su URL
+                (ej: FT232HQ, FT232HQ_I2C o lambda url: FT232HQ_I2C(url, 400000))
+            interface (int): Interfaz FTDI a abrir en cada adaptador
+        """
+        self.serials = list(serials) if serials is not None else None
+        self.factory = factory
+        self.interface = interface
+        self.devices = {}
+        self.workers = {}
+
+    @classmethod
+    def discover(cls):
+        """
+        Busca los adaptadores FT232H conectados
+
+        Returns:
+            list: Números de serie encontrados, ordenados
+        """
+        devices = get_cache().refresh([(cls.VENDOR_ID, cls.PRODUCT_ID)])
+        return sorted(device['serial'] for device in devices if device['serial'])
+
+    def url_for(self, serial):
+        """
+        Construye la URL FTDI de un adaptador a partir de su número de serie
+        """
+        return f"ftdi://ftdi:ft232h:{serial}/{self.interface}"
+
+    def open(self, timeout=None):
+        """
+        Abre en paralelo todos los adaptadores del pool
+
+        Args:
+            timeout (float): Tiempo máximo total en segundos
+
+        Returns:
+            dict: PoolResult por número de serie; value indica si conectó
+        """
+        if self.serials is None:
+            self.serials = self.discover()
+
+        for serial in self.serials:
+            if serial not in self.workers:
+                url = self.url_for(serial)
+                self.devices[serial] = self.factory(url)
+                self.workers[serial] = DeviceWorker.acquire(url)
+
+        results = self.run(self._connect, timeout=timeout)
+        for result in results.values():
+            if result.ok and not result.value:
+                result.error = Exception("No se pudo conectar")
+        return results
+
+    @staticmethod
+    def _connect(device):
+        device.connect()
+        return device.connected
+
+    def run(self, operation, *args, serials=None, timeout=None, **kwargs):
+        """
+        Ejecuta la misma operación en varios adaptadores a la vez
+
+        Args:
+            operation (callable | str): Función operation(device, *args, **kwargs)
+                o nombre de un método del dispositivo
+            serials (list): Adaptadores a usar (None = todos los del pool)
+            timeout (float): Tiempo máximo total en segundos
+
+        Returns:
+            dict: PoolResult por número de serie
+        """
+        if serials is None:
+            serials = list(self.workers)
+
+        def job(device):
+            start = time.perf_counter()
+            if isinstance(operation, str):
+                value = getattr(device, operation)(*args, **kwargs)
+            else:
+                value = operation(device, *args, **kwargs)
+            return value, time.perf_counter() - start
+
+        futures = {}
+        results = {}
+        for serial in serials:
+            if serial not in self.workers:
+                results[serial] = PoolResult(serial, error=KeyError(f"Adaptador {serial} no está en el pool"))
+                continue
+            futures[serial] = self.workers[serial].submit(job, self.devices[serial])
+
+        wait(futures.values(), timeout=timeout)
+        for serial, future in futures.items():
+            if not future.done():
+                # Solo se cancela si aún no ha empezado; una operación en
+                # curso sigue ocupando el hilo de E/S hasta que termine
+                future.cancel()
+                results[serial] = PoolResult(serial, error=TimeoutError("Tiempo de espera agotado"))
+            elif future.exception() is not None:
+                results[serial] = PoolResult(serial, error=future.exception())
+            else:
+                value, elapsed = future.result()
+                results[serial] = PoolResult(serial, value, elapsed=elapsed)
+        return {serial: results[serial] for serial in serials}
+
+    def close(self, timeout=5.0):
+        """
+        Desconecta todos los adaptadores y detiene sus hilos de E/S
+
+        Los hilos se liberan aunque la desconexión no termine a tiempo; los
+        que siguen bloqueados no se esperan.
+
+        Args:
+            timeout (float): Tiempo máximo total de la desconexión en segundos
+        """
+        results = {}
+        try:
+            results = self.run('disconnect', timeout=timeout)
+        finally:
+            for serial, worker in self.workers.items():
+                result = results.get(serial)
+                worker.release(wait=result is not None and not isinstance(result.error, TimeoutError))
+            self.workers = {}
+            self.devices = {}
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    # Ejemplo de uso
+    from FT232HQ_I2C import FT232HQ_I2C
+    from TMP100 import TMP100
+
+    def read_tmp100(i2c):
+        return TMP100(i2c, address='00').read_temperature()
+
+    pool = FT232HQPool(factory=FT232HQ_I2C)
+    try:
+        start = time.perf_counter()
+        for serial, result in pool.open().items():
+            print(f"{serial}: {'conectado' if result.ok else result.error}")
+
+        results = pool.run(read_tmp100, timeout=5.0)
+        for serial, result in results.items():
+            if result.ok:
+                print(f"{serial}: {result.value:.2f}°C ({result.elapsed * 1000:.1f} ms)")
+            else:
+                print(f"{serial}: error {result.error}")
+        print(f"Tiempo total: {(time.perf_counter() - start) * 1000:.1f} ms")
+    finally:
+        pool.close()
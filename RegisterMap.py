@@ -0,0 +1,275 @@
+class Field:
+    """
+    Campo de bits dentro de un registro
+    """
+
+    def __init__(self, name, lsb, width=1, signed=False):
+        """
+        Args:
+            name (str): Nombre del campo
+            lsb (int): Posición del bit menos significativo
+            width (int): Número de bits
+            signed (bool): Si el campo está en complemento a dos
+        """
+        self.name = name
+        self.lsb = lsb
+        self.width = width
+        self.signed = signed
+        self.mask = ((1 << width) - 1) << lsb
+
+    def extract(self, value):
+        """
+        Obtiene el valor del campo a partir del valor del registro
+        """
+        field = (value & self.mask) >> self.lsb
+        if self.signed and field & (1 << (self.width - 1)):
+            field -= 1 << self.width
+        return field
+
+    def insert(self, value, field):
+        """
+        Devuelve el valor del registro con el campo reemplazado
+        """
+        if self.signed:
+            low, high = -(1 << (self.width - 1)), (1 << (self.width - 1)) - 1
+        else:
+            low, high = 0, (1 << self.width) - 1
+        if not low <= field <= high:
+            raise ValueError(f"Valor {field} fuera de rango para el campo {self.name}")
+        return (value & ~self.mask) | ((field << self.lsb) & self.mask)
+
+
+class Register:
+    """
+    Declaración de un registro de un dispositivo
+    """
+
+    def __init__(self, name, address, width=1, byteorder='big', fields=(), access='rw', volatile=False):
+        """
+        Args:
+            name (str): Nombre del registro
+            address (int): Dirección (puntero) del registro
+            width (int): Tamaño en bytes
+            byteorder (str): 'big' o 'little'
+            fields (list): Campos de bits (Field) del registro
+            access (str): 'r', 'w' o 'rw'
+            volatile (bool): Si el dispositivo lo modifica por sí mismo (se
+                vuelve a leer en cada acceso en lugar de usar la copia local)
+        """
+        self.name = name
+        self.address = address
+        self.width = width
+        self.byteorder = byteorder
+        self.fields = {field.name: field for field in fields}
+        self.access = access
+        self.volatile = volatile
+
+    def decode(self, data):
+        return int.from_bytes(bytes(data), self.byteorder)
+
+    def encode(self, value):
+        return list(value.to_bytes(self.width, self.byteorder))
+
+
+class I2CRegisterBus:
+    """
+    Acceso a registros de un dispositivo I2C a través de FT232HQ_I2C
+    """
+
+    def __init__(self, i2c, address):
+        """
+        Args:
+            i2c (FT232HQ_I2C): Controlador I2C conectado
+            address (int): Dirección del dispositivo (7 bits)
+        """
+        self.i2c = i2c
+        self.address = address
+
+    def read(self, register, length):
+        data = self.i2c.read_register(self.address, register, length)
+        if len(data) != length:
+            raise Exception(f"Error al leer el registro 0x{register:02x}")
+        return data
+
+    def write(self, register, data):
+        if not self.i2c.write_register(self.address, register, list(data)):
+            raise Exception(f"Error al escribir el registro 0x{register:02x}")
+
+
+class SPIRegisterBus:
+    """
+    Acceso a registros de un dispositivo SPI a través de FT232HQ
+
+    Cada acceso es una única transacción con CS activo: byte de comando
+    (dirección | flag de lectura/escritura) seguido de los datos.
+    """
+
+    def __init__(self, ft232, cs=0, freq=1E6, read_flag=0x80, write_flag=0x00):
+        """
+        Args:
+            ft232 (FT232HQ): Dispositivo conectado
+            cs (int): Número del pin CS a usar
+            freq (float): Frecuencia del bus SPI en Hz
+            read_flag (int): Bits a añadir a la dirección en lecturas
+            write_flag (int): Bits a añadir a la dirección en escrituras
+        """
+        self.ft232 = ft232
+        self.cs = cs
+        self.freq = freq
+        self.read_flag = read_flag
+        self.write_flag = write_flag
+
+    def read(self, register, length):
+        return self.ft232.exchange_spi([register | self.read_flag], length, cs=self.cs, freq=self.freq)
+
+    def write(self, register, data):
+        self.ft232.write_spi(bytes([register | self.write_flag]) + bytes(data), cs=self.cs, freq=self.freq)
+
+
+class RegisterDevice:
+    """
+    Base para dispositivos descritos mediante un mapa de registros.
+
+    Mantiene una imagen local de los registros: las lecturas de registros
+    contiguos se agrupan en una sola transacción, los cambios de campos se
+    aplican sobre la imagen y flush() escribe solo los registros modificados.
+    """
+
+    # Lista de Register, declarada por cada dispositivo
+    REGISTER_MAP = []
+
+    # Si el dispositivo incrementa el puntero automáticamente en lecturas y
+    # escrituras de varios bytes (permite agrupar registros contiguos)
+    AUTO_INCREMENT = True
+
+    def __init__(self, bus):
+        """
+        Args:
+            bus: I2CRegisterBus o SPIRegisterBus del dispositivo
+        """
+        self.bus = bus
+        self.registers = {register.name: register for register in self.REGISTER_MAP}
+        self.image = {}
+        self.dirty = set()
+
+    def _runs(self, registers):
+        """
+        Agrupa registros en tramos de direcciones contiguas
+        """
+        runs = []
+        for register in sorted(registers, key=lambda r: r.address):
+            last = runs[-1][-1] if runs else None
+            if (self.AUTO_INCREMENT and last is not None
+                    and last.address + last.width == register.address):
+                runs[-1].append(register)
+            else:
+                runs.append([register])
+        return runs
+
+    def read(self, *names):
+        """
+        Lee registros del dispositivo y actualiza la imagen local
+
+        Los cambios pendientes de los registros leídos se escriben antes con
+        flush(), para que la lectura no los descarte.
+
+        Args:
+            names (str): Registros a leer (por defecto todos los legibles)
+
+        Returns:
+            dict: Valor de cada registro leído
+        """
+        names = names or [r.name for r in self.REGISTER_MAP if 'r' in r.access]
+        pending = [name for name in names if name in self.dirty]
+        if pending:
+            self.flush(*pending)
+        registers = [self.registers[name] for name in names]
+        for run in self._runs(registers):
+            data = self.bus.read(run[0].address, sum(r.width for r in run))
+            offset = 0
+            for register in run:
+                self.image[register.name] = register.decode(data[offset:offset + register.width])
+                offset += register.width
+        return {name: self.image[name] for name in names}
+
+    def get(self, name):
+        """
+        Devuelve el valor de un registro, leyéndolo solo si hace falta
+
+        Args:
+            name (str): Nombre del registro
+
+        Returns:
+            int: Valor del registro
+        """
+        register = self.registers[name]
+        if name not in self.image or (register.volatile and name not in self.dirty):
+            self.read(name)
+        return self.image[name]
+
+    def set(self, name, value):
+        """
+        Modifica un registro en la imagen local (se escribe con flush())
+
+        Args:
+            name (str): Nombre del registro
+            value (int): Nuevo valor
+        """
+        if self.image.get(name) != value:
+            self.image[name] = value
+            self.dirty.add(name)
+
+    def get_field(self, name, field):
+        """
+        Devuelve el valor de un campo de bits
+
+        Args:
+            name (str): Nombre del registro
+            field (str): Nombre del campo
+        """
+        return self.registers[name].fields[field].extract(self.get(name))
+
+    def set_fields(self, name, **fields):
+        """
+        Modifica campos de un registro en la imagen local (se escribe con
+        flush()); los demás bits del registro se conservan
+
+        Args:
+            name (str): Nombre del registro
+            fields: Valores por nombre de campo
+        """
+        register = self.registers[name]
+        value = self.get(name)
+        for field, field_value in fields.items():
+            value = register.fields[field].insert(value, field_value)
+        self.set(name, value)
+
+    def flush(self, *names):
+        """
+        Escribe en el dispositivo los registros modificados, agrupando los
+        contiguos en una sola transacción
+
+        Args:
+            names (str): Registros a escribir si están modificados (por
+                defecto todos los modificados)
+        """
+        dirty = self.dirty.intersection(names) if names else self.dirty
+        registers = [self.registers[name] for name in dirty]
+        for run in self._runs(registers):
+            data = []
+            for register in run:
+                data += register.encode(self.image[register.name])
+            self.bus.write(run[0].address, data)
+            for register in run:
+                self.dirty.discard(register.name)
+
+    def update(self, name, **fields):
+        """
+        Modifica campos de un registro y lo escribe si cambió
+
+        Args:
+            name (str): Nombre del registro
+            fields: Valores por nombre de campo
+        """
+        self.set_fields(name, **fields)
+        self.flush(name)
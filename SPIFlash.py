@@ -0,0 +1,610 @@
+from contextlib import contextmanager
+import hashlib
+import mmap
+import threading
+import time
+
+
+class FlashError(Exception):
+    """
+    Error de la memoria flash SPI (identificación, timeout o verificación)
+    """
+
+
+@contextmanager
+def open_image(path):
+    """
+    Abre una imagen como archivo mapeado en memoria (solo lectura)
+
+    Args:
+        path (str): Ruta de la imagen
+
+    Returns:
+        mmap.mmap | bytes: Contenido de la imagen (b'' si está vacía)
+    """
+    with open(path, 'rb') as f:
+        try:
+            image = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # No se puede mapear un archivo vacío
+            yield b''
+            return
+        try:
+            yield image
+        finally:
+            image.close()
+
+
+def print_progress(stage, done, total, elapsed):
+    """
+    Callback de progreso por defecto: porcentaje y MB/s por etapa
+    """
+    rate = done / elapsed / 1E6 if elapsed > 0 else 0.0
+    percent = 100.0 * done / total if total else 100.0
+    end = '\n' if done >= total else ''
+    print(f"\r{stage}: {percent:5.1f}% ({done}/{total} bytes, {rate:.2f} MB/s)", end=end, flush=True)
+
+
+class SPIFlash:
+    """
+    Motor de programación de memorias flash/EEPROM SPI NOR sobre FT232HQ.
+
+    Cada página se programa en un único lote MPSSE (WREN + PAGE PROGRAM +
+    varias lecturas de estado), de modo que en el caso normal no hace falta
+    ningún viaje USB adicional para esperar a que termine la escritura.
+    """
+
+    # Comandos JEDEC estándar
+    CMD_READ_JEDEC_ID = 0x9F
+    CMD_READ_STATUS = 0x05
+    CMD_WRITE_ENABLE = 0x06
+    CMD_PAGE_PROGRAM = 0x02
+    CMD_FAST_READ = 0x0B
+    CMD_CHIP_ERASE = 0xC7
+
+    # Tamaños de borrado y su comando, de mayor a menor
+    ERASE_COMMANDS = [
+        (0x10000, 0xD8),  # Bloque de 64 KB
+        (0x8000, 0x52),   # Bloque de 32 KB
+        (0x1000, 0x20)    # Sector de 4 KB
+    ]
+
+    # Bits del registro de estado
+    STATUS_WIP = 0x01  # Escritura en curso
+    STATUS_WEL = 0x02  # Escritura habilitada
+
+    PAGE_SIZE = 256
+    READ_CHUNK = 0xFF00  # SpiController.PAYLOAD_MAX_LENGTH de pyftdi 0.56
+    PROGRESS_STEP = 0x10000  # Bytes programados entre llamadas de progreso
+
+    def __init__(self, spi, cs=0, freq=30E6, poll_count=8, timeout=10.0):
+        """
+        Inicializa el motor de programación
+
+        Args:
+            spi: FT232HQ conectado (o SimulatedFlash) con exchange_spi_batch()
+            cs (int): Número del pin CS a usar
+            freq (float): Frecuencia del bus SPI en Hz
+            poll_count (int): Lecturas de estado iniciales añadidas a cada lote
+                de programación (se ajusta automáticamente)
+            timeout (float): Tiempo máximo de espera por operación en segundos
+        """
+        self.spi = spi
+        self.cs = cs
+        self.freq = freq
+        self.poll_count = poll_count
+        self.timeout = timeout
+        self.jedec_id = None
+        self.size = None
+
+    def _batch(self, transactions):
+        return self.spi.exchange_spi_batch(transactions, cs=self.cs, freq=self.freq)
+
+    @staticmethod
+    def _address(address):
+        return [(address >> 16) & 0xFF, (address >> 8) & 0xFF, address & 0xFF]
+
+    def probe(self):
+        """
+        Lee el identificador JEDEC y deduce la capacidad de la memoria
+
+        Returns:
+            dict: manufacturer, memory_type, capacity y size (bytes)
+        """
+        data = self._batch([([self.CMD_READ_JEDEC_ID], 3)])[0]
+        if len(data) != 3 or data in (b'\x00\x00\x00', b'\xff\xff\xff'):
+            raise FlashError("No se detectó ninguna memoria flash SPI")
+
+        manufacturer, memory_type, capacity = data
+        self.jedec_id = bytes(data)
+        # La mayoría de fabricantes codifican la capacidad como log2(bytes)
+        self.size = 1 << capacity
+        if self.size > 1 << 24:
+            raise FlashError("Memorias mayores de 16 MB (direcciones de 4 bytes) no soportadas")
+        return {
+            'manufacturer': manufacturer,
+            'memory_type': memory_type,
+            'capacity': capacity,
+            'size': self.size
+        }
+
+    def read_status(self):
+        """
+        Lee el registro de estado
+
+        Returns:
+            int: Valor del registro de estado
+        """
+        return self._batch([([self.CMD_READ_STATUS], 1)])[0][0]
+
+    def wait_ready(self, timeout=None):
+        """
+        Espera a que termine la operación de escritura/borrado en curso
+
+        Args:
+            timeout (float): Tiempo máximo en segundos
+        """
+        deadline = time.perf_counter() + (timeout or self.timeout)
+        polls = [([self.CMD_READ_STATUS], 1)] * self.poll_count
+        while True:
+            for status in self._batch(polls):
+                if not status[0] & self.STATUS_WIP:
+                    return
+            if time.perf_counter() > deadline:
+                raise FlashError("Tiempo de espera agotado: la memoria sigue ocupada")
+
+    def plan_erase(self, offset, length):
+        """
+        Calcula el mínimo número de borrados que cubren un rango
+
+        El rango se amplía a los límites de sector de 4 KB; el contenido de
+        la memoria fuera del rango pero dentro de esos sectores se pierde.
+
+        Args:
+            offset (int): Dirección inicial
+            length (int): Cantidad de bytes
+
+        Returns:
+            list: Tuplas (address, size, command) ordenadas por dirección
+        """
+        if length <= 0:
+            return []
+        sector = self.ERASE_COMMANDS[-1][0]
+        start = offset - offset % sector
+        end = -(-(offset + length) // sector) * sector
+        if self.size is not None and start == 0 and end >= self.size:
+            return [(0, self.size, self.CMD_CHIP_ERASE)]
+
+        plan = []
+        address = start
+        while address < end:
+            for size, command in self.ERASE_COMMANDS:
+                if address % size == 0 and address + size <= end:
+                    plan.append((address, size, command))
+                    address += size
+                    break
+        return plan
+
+    def erase(self, offset, length, progress=None):
+        """
+        Borra el rango indicado con el plan de borrado mínimo
+
+        Args:
+            offset (int): Dirección inicial
+            length (int): Cantidad de bytes
+            progress (callable): progress(stage, done, total, elapsed)
+
+        Returns:
+            list: Plan de borrado ejecutado
+        """
+        plan = self.plan_erase(offset, length)
+        total = sum(size for _, size, _ in plan)
+        done = 0
+        start = time.perf_counter()
+        for address, size, command in plan:
+            if command == self.CMD_CHIP_ERASE:
+                out = [command]
+            else:
+                out = [command] + self._address(address)
+            self._batch([([self.CMD_WRITE_ENABLE], 0), (out, 0)])
+            self.wait_ready(max(self.timeout, 200.0) if command == self.CMD_CHIP_ERASE else None)
+            done += size
+            if progress:
+                progress('Borrado', done, total, time.perf_counter() - start)
+        return plan
+
+    def _program_page(self, address, data):
+        """
+        Programa una página y comprueba el estado en el mismo lote MPSSE
+        """
+        out = [self.CMD_PAGE_PROGRAM] + self._address(address)
+        transactions = [([self.CMD_WRITE_ENABLE], 0), (bytes(out) + bytes(data), 0)]
+        transactions += [([self.CMD_READ_STATUS], 1)] * self.poll_count
+        statuses = self._batch(transactions)[2:]
+
+        for index, status in enumerate(statuses):
+            if not status[0] & self.STATUS_WIP:
+                # Ajustar las lecturas del siguiente lote al tiempo real de escritura
+                self.poll_count = max(index + 2, 1)
+                return
+        self.poll_count += max(1, self.poll_count // 2)
+        self.wait_ready()
+
+    def program(self, image, offset=0, erase=True, verify=True, progress=print_progress):
+        """
+        Borra, programa y verifica una imagen
+
+        Args:
+            image (str | bytes-like): Ruta de la imagen (se mapea en memoria)
+                o buffer ya mapeado
+            offset (int): Dirección de la memoria donde empieza la imagen
+            erase (bool): Borrar antes de programar
+            verify (bool): Verificar después de programar
+            progress (callable): progress(stage, done, total, elapsed) o None
+
+        Returns:
+            dict: bytes, seconds, mb_s y sha256 (si se verificó)
+        """
+        if isinstance(image, str):
+            with open_image(image) as mapped:
+                return self.program(mapped, offset, erase, verify, progress)
+
+        view = memoryview(image)
+        total = len(view)
+        if self.size is None:
+            self.probe()
+        if offset + total > self.size:
+            raise FlashError("La imagen no cabe en la memoria")
+
+        start = time.perf_counter()
+        if erase:
+            self.erase(offset, total, progress)
+
+        program_start = time.perf_counter()
+        blank = b'\xff' * self.PAGE_SIZE
+        position = 0
+        while position < total:
+            address = offset + position
+            # Las páginas no pueden cruzar un límite de PAGE_SIZE
+            length = min(self.PAGE_SIZE - address % self.PAGE_SIZE, total - position)
+            page = view[position:position + length]
+            # Tras el borrado, las páginas a 0xFF no necesitan programarse
+            if not (erase and page == blank[:length]):
+                self._program_page(address, page)
+            position += length
+            if progress and (position % self.PROGRESS_STEP < length or position == total):
+                progress('Programación', position, total, time.perf_counter() - program_start)
+
+        result = {'bytes': total}
+        if verify:
+            result['sha256'] = self.verify(view, offset, progress)
+        result['seconds'] = time.perf_counter() - start
+        result['mb_s'] = total / result['seconds'] / 1E6 if result['seconds'] > 0 else 0.0
+        return result
+
+    def _payload_limit(self):
+        """
+        Mayor lectura admitida en una transacción por el controlador SPI
+        """
+        controller = getattr(self.spi, 'spi', None)
+        return getattr(controller, 'PAYLOAD_MAX_LENGTH', self.READ_CHUNK)
+
+    def read_chunks(self, offset, length, chunk_size=None):
+        """
+        Lee un rango de la memoria en bloques
+
+        Args:
+            offset (int): Dirección inicial
+            length (int): Cantidad de bytes
+            chunk_size (int): Tamaño de cada lectura (por defecto READ_CHUNK);
+                se limita al máximo por transacción del controlador SPI
+
+        Yields:
+            bytes: Datos de cada bloque
+        """
+        chunk_size = min(chunk_size or self.READ_CHUNK, self._payload_limit())
+        position = 0
+        while position < length:
+            size = min(chunk_size, length - position)
+            out = [self.CMD_FAST_READ] + self._address(offset + position) + [0]
+            yield self._batch([(out, size)])[0]
+            position += size
+
+    def read(self, offset, length):
+        """
+        Lee un rango de la memoria
+
+        Returns:
+            bytes: Datos leídos
+        """
+        return b''.join(self.read_chunks(offset, length))
+
+    def verify(self, image, offset=0, progress=print_progress):
+        """
+        Compara la memoria con la imagen bloque a bloque, sin cargar la
+        imagen completa en memoria
+
+        Args:
+            image (str | bytes-like): Ruta de la imagen o buffer mapeado
+            offset (int): Dirección de la memoria donde empieza la imagen
+            progress (callable): progress(stage, done, total, elapsed) o None
+
+        Returns:
+            str: SHA-256 de los datos leídos (igual al de la imagen)
+        """
+        if isinstance(image, str):
+            with open_image(image) as mapped:
+                return self.verify(mapped, offset, progress)
+
+        view = memoryview(image)
+        total = len(view)
+        digest = hashlib.sha256()
+        position = 0
+        start = time.perf_counter()
+        for chunk in self.read_chunks(offset, total):
+            expected = view[position:position + len(chunk)]
+            if chunk != expected:
+                mismatch = next(i for i in range(len(chunk)) if chunk[i] != expected[i])
+                raise FlashError(f"Error de verificación en la dirección 0x{offset + position + mismatch:06x}")
+            digest.update(chunk)
+            position += len(chunk)
+            if progress:
+                progress('Verificación', position, total, time.perf_counter() - start)
+        return digest.hexdigest()
+
+
+class SimulatedFlash:
+    """
+    Memoria flash SPI NOR simulada, para probar SPIFlash sin hardware.
+
+    Puede usarse directamente como transporte (exchange_spi_batch) o, con
+    simulated_ft232hq(), detrás del constructor de lotes MPSSE de FT232HQ.
+    """
+
+    def __init__(self, size=0x100000, jedec_id=(0xEF, 0x40, 0x14), program_polls=3, erase_polls=20):
+        """
+        Args:
+            size (int): Capacidad en bytes
+            jedec_id (tuple): Fabricante, tipo y capacidad devueltos por 0x9F
+            program_polls (int): Lecturas de estado ocupadas tras programar una página
+            erase_polls (int): Lecturas de estado ocupadas tras un borrado
+        """
+        self.memory = bytearray(b'\xff' * size)
+        self.jedec_id = bytes(jedec_id)
+        self.program_polls = program_polls
+        self.erase_polls = erase_polls
+        self.busy = 0
+        self.wel = False
+        self.transactions = 0
+        self.batches = 0
+        self.erases = []
+
+    def exchange_spi_batch(self, transactions, cs=0, freq=30E6):
+        self.batches += 1
+        return [self._transaction(bytes(data), readlen) for data, readlen in transactions]
+
+    def exchange_spi(self, data, readlen, cs=0, freq=30E6):
+        return self.exchange_spi_batch([(data, readlen)], cs, freq)[0]
+
+    def write_spi(self, data, cs=0, freq=30E6):
+        self.exchange_spi_batch([(data, 0)], cs, freq)
+
+    def _transaction(self, data, readlen):
+        self.transactions += 1
+        if not data:
+            # Sin comando la memoria no conduce MISO
+            return b'\xff' * readlen
+        command = data[0]
+        address = int.from_bytes(data[1:4], 'big') if len(data) >= 4 else 0
+
+        if command == SPIFlash.CMD_READ_STATUS:
+            status = (SPIFlash.STATUS_WIP if self.busy else 0) | (SPIFlash.STATUS_WEL if self.wel else 0)
+            if self.busy:
+                self.busy -= 1
+            return bytes([status]) * readlen
+        if command == SPIFlash.CMD_READ_JEDEC_ID:
+            return self.jedec_id[:readlen]
+        if self.busy:
+            # Mientras está ocupada, la memoria ignora el resto de comandos
+            return b'\xff' * readlen
+        if command == SPIFlash.CMD_WRITE_ENABLE:
+            self.wel = True
+        elif command in (0x03, SPIFlash.CMD_FAST_READ):
+            start = address % len(self.memory)
+            return bytes(self.memory[start:start + readlen])
+        elif command == SPIFlash.CMD_PAGE_PROGRAM and self.wel:
+            page = address - address % SPIFlash.PAGE_SIZE
+            for i, byte in enumerate(data[4:]):
+                # La escritura da la vuelta dentro de la página y solo pasa bits a 0
+                target = page + (address + i) % SPIFlash.PAGE_SIZE
+                self.memory[target] &= byte
+            self.wel = False
+            self.busy = self.program_polls
+        elif self.wel and command in [c for _, c in SPIFlash.ERASE_COMMANDS] + [SPIFlash.CMD_CHIP_ERASE]:
+            size = dict((c, s) for s, c in SPIFlash.ERASE_COMMANDS).get(command, len(self.memory))
+            start = 0 if command == SPIFlash.CMD_CHIP_ERASE else address - address % size
+            self.memory[start:start + size] = b'\xff' * size
+            self.erases.append((start, size))
+            self.wel = False
+            self.busy = self.erase_polls
+        return b'\x00' * readlen
+
+
+class SimulatedFtdi:
+    """
+    Motor MPSSE simulado: decodifica el flujo de comandos que recibiría el
+    FT232H (Ftdi.write_data) y aplica cada ciclo de CS a una SimulatedFlash.
+
+    Rechaza cualquier opcode o framing de CS no válido, de modo que el
+    constructor de lotes de FT232HQ se prueba con los mismos bytes que se
+    enviarían por USB.
+    """
+
+    # Bits de ADBUS usados por pyftdi para SPI
+    SCK_BIT = 0x01
+    DO_BIT = 0x02
+    CS_BIT = 0x08
+
+    def __init__(self, flash, cs=0):
+        """
+        Args:
+            flash (SimulatedFlash): Memoria conectada al CS indicado
+            cs (int): Número del pin CS de la memoria
+        """
+        self.flash = flash
+        self.cs_bit = self.CS_BIT << cs
+        self.frequency = None
+        self.writes = 0
+        self._selected = False
+        self._written = bytearray()
+        self._done = False
+        self._rx = bytearray()
+
+    def set_frequency(self, frequency):
+        self.frequency = frequency
+        return frequency
+
+    def write_data(self, data):
+        from pyftdi.ftdi import Ftdi
+
+        self.writes += 1
+        data = bytes(data)
+        i = 0
+        while i < len(data):
+            opcode = data[i]
+            if opcode == Ftdi.SET_BITS_LOW:
+                value, direction = data[i + 1], data[i + 2]
+                outputs = self.SCK_BIT | self.DO_BIT | self.cs_bit
+                if direction & outputs != outputs:
+                    raise ValueError(f"Dirección de pines SPI no válida: 0x{direction:02x}")
+                self._set_cs(not value & self.cs_bit)
+                i += 3
+            elif opcode in (Ftdi.WRITE_BYTES_NVE_MSB, Ftdi.READ_BYTES_NVE_MSB):
+                length = int.from_bytes(data[i + 1:i + 3], 'little') + 1
+                if not self._selected:
+                    raise ValueError("Transferencia SPI con CS inactivo")
+                if opcode == Ftdi.WRITE_BYTES_NVE_MSB:
+                    if self._done:
+                        raise ValueError("Escritura SPI después de una lectura")
+                    self._written.extend(data[i + 3:i + 3 + length])
+                    i += 3 + length
+                else:
+                    self._rx.extend(self.flash._transaction(bytes(self._written), length))
+                    self._done = True
+                    i += 3
+            elif opcode == Ftdi.SEND_IMMEDIATE:
+                i += 1
+            else:
+                raise ValueError(f"Opcode MPSSE no válido: 0x{opcode:02x}")
+        return len(data)
+
+    def _set_cs(self, selected):
+        if selected and not self._selected:
+            self._written = bytearray()
+            self._done = False
+        elif not selected and self._selected and not self._done and self._written:
+            self.flash._transaction(bytes(self._written), 0)
+        self._selected = selected
+
+    def read_data_bytes(self, size, attempt=1):
+        data, self._rx = bytes(self._rx[:size]), self._rx[size:]
+        return data
+
+
+class SimulatedSpiPort:
+    """
+    Puerto SPI con el mismo estado de CS que SpiPort de pyftdi 0.56 (modo 0)
+    """
+
+    def __init__(self, cs, freq):
+        cs_clock = 0xFF & ~(SimulatedFtdi.SCK_BIT | SimulatedFtdi.DO_BIT)
+        cs_select = 0xFF & ~((SimulatedFtdi.CS_BIT << cs) | SimulatedFtdi.SCK_BIT | SimulatedFtdi.DO_BIT)
+        self._cs_prolog = bytes([cs_clock, cs_select])
+        self._cs_epilog = bytes([cs_select, cs_clock])
+        self.frequency = freq
+
+
+class SimulatedSpiController:
+    """
+    Controlador SPI con el estado interno que usa FT232HQ.exchange_spi_batch()
+    (equivalente a SpiController de pyftdi 0.56 con un único CS)
+    """
+
+    # Valor de pyftdi 0.56; se usa el de pyftdi si está instalado
+    PAYLOAD_MAX_LENGTH = 0xFF00
+
+    def __init__(self, flash):
+        try:
+            from pyftdi.spi import SpiController
+            self.PAYLOAD_MAX_LENGTH = SpiController.PAYLOAD_MAX_LENGTH
+        except (ImportError, AttributeError):
+            pass
+        self.ftdi = SimulatedFtdi(flash)
+        self._lock = threading.Lock()
+        self._frequency = 0.0
+        self._cs_bits = SimulatedFtdi.CS_BIT
+        self._spi_mask = self._cs_bits | 0x07
+        self._gpio_low = 0
+        self.direction = self._cs_bits | SimulatedFtdi.SCK_BIT | SimulatedFtdi.DO_BIT
+
+    def get_port(self, cs=0, freq=None, mode=0):
+        return SimulatedSpiPort(cs, freq)
+
+    def terminate(self):
+        pass
+
+
+def simulated_ft232hq(flash=None):
+    """
+    Crea un FT232HQ conectado a una memoria simulada a nivel MPSSE
+
+    Args:
+        flash (SimulatedFlash): Memoria simulada (por defecto una de 1 MB)
+
+    Returns:
+        FT232HQ: Dispositivo listo para usar con SPIFlash
+    """
+    from FT232HQ import FT232HQ
+
+    ft232 = FT232HQ()
+    ft232.spi = SimulatedSpiController(flash or SimulatedFlash())
+    ft232.connected = True
+    return ft232
+
+
+if __name__ == "__main__":
+    # Ejemplo de uso: python SPIFlash.py imagen.bin [offset]
+    # Sin argumentos programa una imagen de prueba en una memoria simulada
+    import os
+    import sys
+    import tempfile
+
+    if len(sys.argv) > 1:
+        from FT232HQ import FT232HQ
+
+        ft232 = FT232HQ()
+        try:
+            ft232.connect()
+            flash = SPIFlash(ft232, cs=0, freq=30E6)
+            print("Memoria detectada:", flash.probe())
+            offset = int(sys.argv[2], 0) if len(sys.argv) > 2 else 0
+            result = flash.program(sys.argv[1], offset)
+            print(f"Programados {result['bytes']} bytes en {result['seconds']:.2f} s "
+                  f"({result['mb_s']:.2f} MB/s), SHA-256 {result['sha256']}")
+        finally:
+            ft232.disconnect()
+    else:
+        sim = SimulatedFlash()
+        ft232 = simulated_ft232hq(sim)
+        flash = SPIFlash(ft232)
+        print("Memoria simulada:", flash.probe())
+
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(os.urandom(200000))
+        try:
+            result = flash.program(f.name, offset=0x1000)
+            print(f"Resultado: {result}")
+            print(f"Borrados: {sim.erases}")
+            print(f"Lotes USB: {ft232.spi.ftdi.writes}, transacciones SPI: {sim.transactions}")
+        finally:
+            os.unlink(f.name)
@@ -0,0 +1,299 @@
+from array import array
+import os
+import queue
+import struct
+import threading
+import time
+
+# Archivo de datos: cabecera + bloques. Cada bloque guarda sus columnas
+# contiguas: int64 timestamps (ns), uint32 palabras de puerto (pines ADBUS en
+# los bits 0-7), int16 palabras del sensor, con relleno hasta múltiplo de 8 bytes.
+DATA_MAGIC = b'FTTSDAT1'
+# Archivo de índice: cabecera + un registro por bloque
+# (offset, número de muestras, timestamp mínimo, timestamp máximo)
+INDEX_MAGIC = b'FTTSIDX1'
+INDEX_RECORD = struct.Struct('<qqqq')
+
+
+def _chunk_size(count):
+    size = count * (8 + 4 + 2)
+    return size + (-size % 8)
+
+
+class TimeSeriesLogger:
+    """
+    Registro columnar binario de muestras de TMP100 y GPIO.
+
+    append() solo añade la muestra a un búfer en memoria; los bloques
+    completos se escriben en disco desde un hilo propio, con fsync periódico,
+    de modo que el bucle de adquisición nunca espera al disco.
+    """
+
+    def __init__(self, path, chunk_size=4096, fsync_interval=1.0):
+        """
+        Abre (o crea) un registro para añadir muestras
+
+        Args:
+            path (str): Ruta base; se usan path + '.tsd' (datos) y path + '.tsi' (índice)
+            chunk_size (int): Muestras por bloque
+            fsync_interval (float): Segundos entre fsync (0 = en cada bloque)
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.fsync_interval = fsync_interval
+        self._data, self._index = self._open(path)
+        self._new_buffers()
+        self._pending_index = []
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=f"TimeSeriesLogger {path}", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _open(path):
+        """
+        Abre los archivos y descarta los bloques que el índice referencia
+        pero no están completos en el archivo de datos, y los datos finales
+        que ningún registro del índice referencia
+        """
+        data = open(path + '.tsd', 'a+b')
+        index = open(path + '.tsi', 'a+b')
+        if data.seek(0, os.SEEK_END) == 0:
+            data.write(DATA_MAGIC)
+        if index.seek(0, os.SEEK_END) == 0:
+            index.write(INDEX_MAGIC)
+        data_size = data.seek(0, os.SEEK_END)
+
+        index.seek(len(INDEX_MAGIC))
+        records = 0
+        end = len(DATA_MAGIC)
+        while True:
+            record = index.read(INDEX_RECORD.size)
+            if len(record) < INDEX_RECORD.size:
+                break
+            offset, count, _, _ = INDEX_RECORD.unpack(record)
+            # Nunca se amplía el archivo de datos: un bloque truncado se descarta
+            if offset != end or count <= 0 or offset + _chunk_size(count) > data_size:
+                break
+            end = offset + _chunk_size(count)
+            records += 1
+        index.truncate(len(INDEX_MAGIC) + records * INDEX_RECORD.size)
+        data.truncate(end)
+        data.seek(0, os.SEEK_END)
+        index.seek(0, os.SEEK_END)
+        return data, index
+
+    def _new_buffers(self):
+        self._timestamps = array('q')
+        self._ports = array('I')
+        self._raws = array('h')
+
+    def append(self, timestamp, raw=0, port=0):
+        """
+        Añade una muestra
+
+        Args:
+            timestamp (int): Instante en nanosegundos (ej: time.time_ns())
+            raw (int): Palabra de 16 bits del sensor (ej: TMP100.read_raw())
+            port (int): Palabra de pines ADBUS (ej: FT232HQ.read_port_word())
+        """
+        self._check_error()
+        self._timestamps.append(timestamp)
+        self._raws.append(raw)
+        self._ports.append(port)
+        if len(self._timestamps) >= self.chunk_size:
+            self._queue.put((self._timestamps, self._ports, self._raws))
+            self._new_buffers()
+
+    def record(self, sensor=None, ft232=None):
+        """
+        Lee el sensor y/o los pines y añade la muestra con el instante actual
+
+        Args:
+            sensor (TMP100): Sensor a leer
+            ft232 (FT232HQ): Dispositivo cuyos pines ADBUS se leen
+        """
+        raw = sensor.read_raw() if sensor is not None else 0
+        port = ft232.read_port_word() if ft232 is not None else 0
+        self.append(time.time_ns(), raw, port)
+
+    def flush(self, wait=True):
+        """
+        Envía al disco las muestras pendientes, aunque el bloque no esté lleno
+
+        Args:
+            wait (bool): Esperar a que estén escritas y sincronizadas
+
+        Raises:
+            Exception: Si el hilo de escritura falló (solo con wait=True)
+        """
+        if len(self._timestamps):
+            self._queue.put((self._timestamps, self._ports, self._raws))
+            self._new_buffers()
+        if wait:
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait()
+            self._check_error()
+
+    def close(self):
+        """
+        Escribe las muestras pendientes y cierra el registro
+
+        Raises:
+            Exception: Si el hilo de escritura falló (los datos pueden estar incompletos)
+        """
+        self.flush(wait=False)
+        self._queue.put(None)
+        self._thread.join()
+        self._data.close()
+        self._index.close()
+        self._check_error()
+
+    def _check_error(self):
+        if self._error is not None:
+            raise Exception(f"Error en el registro: {str(self._error)}") from self._error
+
+    def _sync(self):
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        # El índice solo referencia datos ya sincronizados
+        if self._pending_index:
+            self._index.write(b''.join(self._pending_index))
+            self._pending_index = []
+        self._index.flush()
+        os.fsync(self._index.fileno())
+
+    def _run(self):
+        last_sync = time.monotonic()
+        dirty = False
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval or None)
+            except queue.Empty:
+                item = False
+            try:
+                if isinstance(item, tuple):
+                    self._write_chunk(*item)
+                    dirty = True
+                if dirty and (item is None or isinstance(item, threading.Event)
+                              or time.monotonic() - last_sync >= self.fsync_interval):
+                    self._sync()
+                    dirty = False
+                    last_sync = time.monotonic()
+            except Exception as e:
+                self._error = e
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                break
+
+    def _write_chunk(self, timestamps, ports, raws):
+        offset = self._data.tell()
+        self._data.write(timestamps.tobytes())
+        self._data.write(ports.tobytes())
+        self._data.write(raws.tobytes())
+        count = len(timestamps)
+        self._data.write(b'\x00' * (_chunk_size(count) - count * 14))
+        self._pending_index.append(INDEX_RECORD.pack(offset, count, min(timestamps), max(timestamps)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TimeSeriesReader:
+    """
+    Consultas por rango de tiempo sobre un registro de TimeSeriesLogger.
+
+    Solo se mapean en memoria los bloques cuyo rango de tiempo se solapa con
+    la consulta. Requiere NumPy.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Ruta base del registro (sin extensión)
+        """
+        import numpy as np
+
+        self.path = path
+        with open(path + '.tsi', 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError("Archivo de índice no válido")
+            index = f.read()
+        index = index[:len(index) - len(index) % INDEX_RECORD.size]
+        index = np.frombuffer(index, dtype=np.int64).reshape(-1, 4)
+        # Bloques incompletos en el archivo de datos no se sirven
+        data_size = os.path.getsize(path + '.tsd')
+        sizes = np.array([_chunk_size(int(count)) for count in index[:, 1]], dtype=np.int64)
+        self.index = index[index[:, 0] + sizes <= data_size]
+
+    def __len__(self):
+        return int(self.index[:, 1].sum())
+
+    def query(self, t_start=None, t_end=None):
+        """
+        Devuelve las muestras con t_start <= timestamp <= t_end
+
+        Args:
+            t_start (int): Instante inicial en ns (None = sin límite)
+            t_end (int): Instante final en ns (None = sin límite)
+
+        Returns:
+            dict: Arrays de NumPy 'timestamp' (int64), 'raw' (int16) y 'port' (uint32)
+        """
+        import numpy as np
+
+        selected = np.ones(len(self.index), dtype=bool)
+        if t_start is not None:
+            selected &= self.index[:, 3] >= t_start
+        if t_end is not None:
+            selected &= self.index[:, 2] <= t_end
+
+        columns = {'timestamp': [], 'raw': [], 'port': []}
+        for offset, count, _, _ in self.index[selected]:
+            offset, count = int(offset), int(count)
+            chunk = np.memmap(self.path + '.tsd', dtype=np.uint8, mode='r',
+                              offset=offset, shape=(_chunk_size(count),))
+            timestamps = chunk[:count * 8].view(np.int64)
+            ports = chunk[count * 8:count * 12].view(np.uint32)
+            raws = chunk[count * 12:count * 14].view(np.int16)
+
+            mask = np.ones(count, dtype=bool)
+            if t_start is not None:
+                mask &= timestamps >= t_start
+            if t_end is not None:
+                mask &= timestamps <= t_end
+            columns['timestamp'].append(timestamps[mask])
+            columns['port'].append(ports[mask])
+            columns['raw'].append(raws[mask])
+
+        dtypes = {'timestamp': np.int64, 'raw': np.int16, 'port': np.uint32}
+        return {name: np.concatenate(parts) if parts else np.empty(0, dtype=dtypes[name])
+                for name, parts in columns.items()}
+
+
+if __name__ == "__main__":
+    # Ejemplo de uso: registrar temperatura y pines durante 10 segundos
+    from FT232HQ_I2C import FT232HQ_I2C
+    from TMP100 import TMP100
+
+    i2c = FT232HQ_I2C(freq=100000)  # 100kHz
+
+    try:
+        i2c.connect()
+        sensor = TMP100(i2c, address='00', resolution=12)
+
+        start = time.time_ns()
+        with TimeSeriesLogger('temperaturas') as logger:
+            while time.time_ns() - start < 10E9:
+                logger.record(sensor=sensor)
+
+        data = TimeSeriesReader('temperaturas').query(start)
+        # 1 LSB de la palabra del TMP100 = 1/256 °C
+        print(f"{len(data['timestamp'])} muestras, media {data['raw'].mean() / 256:.2f}°C")
+    finally:
+        i2c.disconnect()
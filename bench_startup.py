@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+
+from device_cache import NO_CACHE_ENV
+
+# Directorio del repositorio, para importar los módulos desde el subproceso
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_code(statement, setup='', teardown='', repeat=5, env=None):
+    """
+    Mide el tiempo de una sentencia, cada repetición en un intérprete nuevo
+    (sin cachés de módulos ni de enumeración USB del proceso anterior)
+
+    Args:
+        statement (str): Sentencia a medir
+        setup (str): Sentencias previas, no medidas
+        teardown (str): Sentencias posteriores, no medidas
+        repeat (int): Número de repeticiones
+        env (dict): Variables de entorno adicionales
+
+    Returns:
+        float: Mejor tiempo en milisegundos
+    """
+    code = (f"import time\n{setup}\n"
+            f"t = time.perf_counter()\n{statement}\nelapsed = time.perf_counter() - t\n"
+            f"{teardown}\nprint(elapsed * 1000)")
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                check=True, cwd=REPO_DIR, env=dict(os.environ, **(env or {})))
+        times.append(float(output.stdout.strip().splitlines()[-1]))
+    return min(times)
+
+
+def measure_import(statement, repeat=5):
+    """
+    Mide el tiempo de importación en un intérprete nuevo
+
+    Args:
+        statement (str): Sentencia de importación
+        repeat (int): Número de repeticiones
+
+    Returns:
+        float: Mejor tiempo en milisegundos
+    """
+    return measure_code(statement, repeat=repeat)
+
+
+def measure_connect(url, cached=True, repeat=5):
+    """
+    Mide FT232HQ_I2C.connect() completo en un intérprete nuevo, con pyftdi
+    ya importado
+
+    Args:
+        url (str): URL FTDI del adaptador
+        cached (bool): Abrir por bus/dirección en caché o por URL
+        repeat (int): Número de repeticiones
+
+    Returns:
+        float: Mejor tiempo en milisegundos
+    """
+    setup = ("import pyftdi.i2c\nfrom FT232HQ_I2C import FT232HQ_I2C\n"
+             f"i2c = FT232HQ_I2C({url!r}, 100000)")
+    teardown = "assert i2c.connected, 'No se pudo conectar'\ni2c.disconnect()"
+    env = None if cached else {NO_CACHE_ENV: '1'}
+    return measure_code("i2c.connect()", setup, teardown, repeat, env)
+
+
+if __name__ == "__main__":
+    url = sys.argv[1] if len(sys.argv) > 1 else 'ftdi://ftdi:ft232h/1'
+    enumerate_setup = "import pyftdi.usbtools\nfrom device_cache import get_cache"
+    resolve_setup = "import usb.core\nfrom device_cache import get_cache"
+    read_setup = "from device_cache import DeviceCache"
+
+    print("Tiempos de arranque (mejor de 5, intérprete nuevo en cada medida, ms)")
+    print("-" * 70)
+    print(f"import FT232HQ, FT232HQ_I2C:        {measure_import('import FT232HQ, FT232HQ_I2C'):8.2f}")
+    print(f"import controladores pyftdi:        "
+          f"{measure_import('import pyftdi.spi, pyftdi.gpio, pyftdi.i2c'):8.2f}")
+    print(f"Enumeración USB completa:           "
+          f"{measure_code('get_cache().refresh()', enumerate_setup):8.2f}")
+    print(f"Resolución desde caché (bus/addr):  "
+          f"{measure_code(f'get_cache().find_device({url!r})', resolve_setup):8.2f}")
+    print(f"Lectura de caché en frío:           "
+          f"{measure_code(f'DeviceCache().lookup({url!r}, refresh=False)', read_setup):8.2f}")
+    print(f"connect() I2C con caché:            {measure_connect(url, cached=True):8.2f}")
+    print(f"connect() I2C por URL:              {measure_connect(url, cached=False):8.2f}")
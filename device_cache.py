@@ -0,0 +1,296 @@
+from urllib.parse import urlsplit
+import json
+import os
+import threading
+
+# Nombres de fabricante/producto aceptados en las URL FTDI (los mismos alias
+# que pyftdi para el FT232H); otros nombres se resuelven con las tablas de pyftdi
+VENDORS = {'ftdi': 0x0403}
+PRODUCTS = {'ft232h': 0x6014, '232h': 0x6014}
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    'FT232HQ_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'ft232hq', 'devices.json'))
+
+# Si está definida, open_cached() abre siempre por URL (sin caché)
+NO_CACHE_ENV = 'FT232HQ_NO_CACHE'
+
+# Directorio de nodos USB en Linux: cambia cuando se conecta o desconecta un dispositivo
+USB_DEVFS = '/dev/bus/usb'
+
+
+def _pyftdi_id(value, vid=None):
+    """
+    Resuelve un nombre de fabricante (vid=None) o de producto con las tablas
+    de pyftdi; None si pyftdi no está instalado o no lo conoce
+    """
+    try:
+        from pyftdi.ftdi import Ftdi
+    except ImportError:
+        return None
+    if vid is None:
+        return Ftdi.VENDOR_IDS.get(value)
+    return Ftdi.PRODUCT_IDS.get(vid, {}).get(value)
+
+
+def _parse_id(value, names, default, vid=None):
+    if not value:
+        return default
+    if value in names:
+        return names[value]
+    try:
+        return int(value, 16) if value.lower().startswith('0x') else int(value)
+    except ValueError:
+        pass
+    resolved = _pyftdi_id(value, vid)
+    if resolved is None:
+        raise ValueError(f"Identificador USB desconocido en la URL: {value}")
+    return resolved
+
+
+def _topology_signature():
+    """
+    Firma barata de la topología USB (mtime de cada bus en /dev/bus/usb)
+
+    Returns:
+        list: Firma actual, o None si el sistema no la proporciona
+    """
+    try:
+        return [[name, os.stat(os.path.join(USB_DEVFS, name)).st_mtime_ns]
+                for name in sorted(os.listdir(USB_DEVFS))]
+    except OSError:
+        return None
+
+
+class DeviceCache:
+    """
+    Caché persistente de la enumeración USB de adaptadores FTDI.
+
+    Guarda bus/dirección de cada adaptador por vid/pid/número de serie para
+    abrirlo directamente sin leer los descriptores de todos los dispositivos
+    USB. Se invalida al detectar una conexión/desconexión o cuando el
+    adaptador ya no está en el bus/dirección guardados.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        """
+        Inicializa la caché
+
+        Args:
+            path (str): Ruta del archivo JSON de la caché
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._data = None
+
+    @staticmethod
+    def parse_url(url):
+        """
+        Extrae vid, pid y número de serie de una URL FTDI
+
+        Args:
+            url (str): URL (ej: ftdi://ftdi:ft232h:FT1234/1)
+
+        Returns:
+            tuple: (vid, pid, serial); serial es '' si la URL no lo indica
+        """
+        parts = urlsplit(url).netloc.split(':')
+        parts += [''] * (3 - len(parts))
+        vid = _parse_id(parts[0], VENDORS, VENDORS['ftdi'])
+        pid = _parse_id(parts[1], PRODUCTS, PRODUCTS['ft232h'], vid)
+        return vid, pid, parts[2]
+
+    @staticmethod
+    def key(vid, pid, serial):
+        return f"{vid:04x}:{pid:04x}:{serial}"
+
+    def _load(self):
+        if self._data is None:
+            try:
+                with open(self.path) as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {'signature': None, 'devices': {}}
+        return self._data
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(self._data, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Error al guardar la caché de dispositivos: {str(e)}")
+
+    def refresh(self, vps=None):
+        """
+        Realiza la enumeración USB completa y actualiza la caché
+
+        Args:
+            vps (list): Pares (vid, pid) a buscar (por defecto todos los conocidos)
+
+        Returns:
+            list: Entradas de los dispositivos encontrados
+        """
+        from pyftdi.usbtools import UsbTools
+
+        if vps is None:
+            vps = [(vid, pid) for vid in set(VENDORS.values()) for pid in set(PRODUCTS.values())]
+        with self._lock:
+            signature = _topology_signature()
+            devices = {}
+            # nocache: no reutilizar la enumeración guardada por pyftdi
+            for desc, _ in UsbTools.find_all(vps, nocache=True):
+                entry = {
+                    'vid': desc.vid,
+                    'pid': desc.pid,
+                    'serial': desc.sn or '',
+                    'bus': desc.bus,
+                    'address': desc.address,
+                    'description': desc.description,
+                }
+                devices[self.key(desc.vid, desc.pid, entry['serial'])] = entry
+            self._data = {'signature': signature, 'devices': devices}
+            self._save()
+            return list(devices.values())
+
+    def invalidate(self, url=None):
+        """
+        Elimina una entrada (o toda la caché si url es None)
+
+        Args:
+            url (str): URL del dispositivo a invalidar
+        """
+        with self._lock:
+            data = self._load()
+            if url is None:
+                data['devices'] = {}
+            else:
+                # Sin número de serie en la URL se resuelve la entrada real
+                entry = self._match(data['devices'], *self.parse_url(url))
+                if entry is not None:
+                    data['devices'].pop(self.key(entry['vid'], entry['pid'], entry['serial']), None)
+            self._save()
+
+    def lookup(self, url, refresh=True):
+        """
+        Busca la entrada de un dispositivo, enumerando solo si hace falta
+
+        Args:
+            url (str): URL FTDI del dispositivo
+            refresh (bool): Enumerar si la entrada falta o la caché está obsoleta
+
+        Returns:
+            dict: Entrada (vid, pid, serial, bus, address, description) o None
+        """
+        vid, pid, serial = self.parse_url(url)
+        with self._lock:
+            data = self._load()
+            signature = _topology_signature()
+            stale = signature is not None and signature != data['signature']
+            entry = None if stale else self._match(data['devices'], vid, pid, serial)
+            if entry is None and refresh:
+                self.refresh()
+                entry = self._match(self._data['devices'], vid, pid, serial)
+            return entry
+
+    def _match(self, devices, vid, pid, serial):
+        if serial:
+            return devices.get(self.key(vid, pid, serial))
+        # Sin número de serie solo es inequívoco si hay un único adaptador
+        candidates = [e for e in devices.values() if e['vid'] == vid and e['pid'] == pid]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def find_device(self, url):
+        """
+        Obtiene el dispositivo USB por su bus/dirección en caché
+
+        Args:
+            url (str): URL FTDI del dispositivo
+
+        Returns:
+            usb.core.Device: Dispositivo listo para abrir, o None si no se encuentra
+        """
+        import usb.core
+
+        vid, pid, _ = self.parse_url(url)
+        for _ in range(2):
+            entry = self.lookup(url)
+            if entry is None:
+                return None
+            device = usb.core.find(idVendor=vid, idProduct=pid,
+                                   bus=entry['bus'], address=entry['address'])
+            if device is not None:
+                return device
+            # El adaptador cambió de bus/dirección: volver a enumerar
+            self.invalidate(url)
+        return None
+
+    def is_present(self, url):
+        """
+        Comprueba si el adaptador sigue en el bus/dirección de su entrada
+
+        Args:
+            url (str): URL FTDI del dispositivo
+
+        Returns:
+            bool: False si no hay entrada válida o el dispositivo ya no está ahí
+        """
+        import usb.core
+
+        vid, pid, _ = self.parse_url(url)
+        entry = self.lookup(url, refresh=False)
+        if entry is None:
+            return False
+        return usb.core.find(idVendor=vid, idProduct=pid,
+                             bus=entry['bus'], address=entry['address']) is not None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Devuelve la caché de dispositivos compartida por el proceso
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DeviceCache()
+        return _cache
+
+
+def open_cached(url, opener):
+    """
+    Abre un dispositivo usando la caché y recurre a la URL si el adaptador
+    ya no está donde indica la caché
+
+    Los errores de apertura que no se deben a la ubicación del adaptador
+    (ocupado, permisos, configuración) se propagan sin invalidar la caché.
+
+    Args:
+        url (str): URL FTDI del dispositivo
+        opener (callable): Función que abre el dispositivo; recibe un
+            usb.core.Device o, si no hay entrada válida, la URL
+
+    Returns:
+        Lo que devuelva opener
+    """
+    if os.environ.get(NO_CACHE_ENV):
+        return opener(url)
+    cache = get_cache()
+    try:
+        device = cache.find_device(url)
+    except Exception:
+        device = None
+    if device is None:
+        return opener(url)
+    try:
+        return opener(device)
+    except Exception:
+        if cache.is_present(url):
+            raise
+        cache.invalidate(url)
+        return opener(url)
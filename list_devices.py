@@ -1,22 +1,24 @@
-from pyftdi.usbtools import UsbTools
+from device_cache import get_cache
 
 def list_ftdi_devices():
     print("Buscando dispositivos FTDI...")
     try:
-        devices = UsbTools.find_all()
+        # Enumeración completa; el resultado queda en la caché para connect()
+        devices = get_cache().refresh()
         if not devices:
             print("No se encontraron dispositivos FTDI")
             return
         
         print("\nDispositivos FTDI encontrados:")
         for device in devices:
-            print(f"\nURL: {device}")
-            print(f"Vendor ID: 0x{device.vid:04x}")
-            print(f"Product ID: 0x{device.pid:04x}")
-            print(f"Serial Number: {device.sn}")
+            print(f"\nURL: ftdi://ftdi:ft232h:{device['serial']}/1")
+            print(f"Vendor ID: 0x{device['vid']:04x}")
+            print(f"Product ID: 0x{device['pid']:04x}")
+            print(f"Serial Number: {device['serial']}")
+            print(f"Bus/Address: {device['bus']}/{device['address']}")
             print("-" * 50)
     except Exception as e:
         print(f"Error al buscar dispositivos: {str(e)}")
 
 if __name__ == "__main__":
-    list_ftdi_devices() 
\ No newline at end of file
+    list_ftdi_devices()